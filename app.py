@@ -1,11 +1,128 @@
-from flask import Flask, render_template, request, jsonify
-from database import init_db, get_all_projects, get_project, create_project, update_project, delete_project, search_projects
+import os
+import io
+import re
+import hmac
+import time
+import random
+import pstats
+import cProfile
+from datetime import datetime
+from flask import Flask, render_template, request, jsonify, g, send_from_directory
+from database import (
+    init_db, get_project, create_project, update_project, delete_project, query_projects,
+    get_activity_histogram, get_slow_queries, TIMESTAMP_FILTERS, ACTIVITY_BUCKETS, ACTIVITY_FIELDS
+)
 
 app = Flask(__name__)
 
+# Admin token used to trigger profiling and access the admin endpoints (disabled if unset)
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+# Fraction of requests (0.0 - 1.0) profiled without the admin header
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+# Number of profiles kept in PROFILE_DIR; the oldest are deleted beyond this
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', '500'))
+
 # Initialize database on startup
 init_db()
 
+def is_admin_request() -> bool:
+    """Check whether the request carries a valid admin token."""
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+def should_profile() -> bool:
+    """Decide whether the current request should be profiled."""
+    if request.path.startswith('/api/admin/') or request.endpoint == 'static':
+        return False
+    if request.headers.get('X-Profile') and is_admin_request():
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+# SQLite INTEGER is a signed 64-bit value
+SQLITE_INT_MIN = -2 ** 63
+SQLITE_INT_MAX = 2 ** 63 - 1
+
+def parse_timestamp(value: str) -> int:
+    """Parse an epoch seconds value or an ISO 8601 date/datetime (local time) into epoch seconds."""
+    if value.lstrip('-').isdigit():
+        if len(value) == 8:
+            # Also a valid ISO 8601 basic-format date (YYYYMMDD)
+            raise ValueError(f'Ambiguous timestamp: {value}')
+        timestamp = int(value)
+    else:
+        timestamp = int(datetime.fromisoformat(value).timestamp())
+    
+    if not SQLITE_INT_MIN <= timestamp <= SQLITE_INT_MAX:
+        raise ValueError(f'Timestamp out of range: {value}')
+    return timestamp
+
+def parse_date_ranges():
+    """Read the created/updated date-range query parameters, raising ValueError on bad input."""
+    ranges = {}
+    for name in TIMESTAMP_FILTERS:
+        value = request.args.get(name, '').strip()
+        if value:
+            try:
+                ranges[name] = parse_timestamp(value)
+            except (ValueError, OverflowError, OSError):
+                raise ValueError(f'Invalid {name} value: {value}')
+    return ranges
+
+@app.before_request
+def start_profiler():
+    """Start a cProfile session for requests selected for profiling."""
+    if not should_profile():
+        return
+    
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is already active in this process
+        return
+    g.profiler = profiler
+    g.profile_start = time.perf_counter()
+
+@app.after_request
+def save_profile(response):
+    """Stop the request profiler and store its stats for later download."""
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return response
+    
+    profiler.disable()
+    duration_ms = (time.perf_counter() - g.pop('profile_start')) * 1000
+    
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', request.path).strip('_') or 'root'
+    profile_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{request.method}-{slug}-{duration_ms:.0f}ms.prof"
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profiler.dump_stats(os.path.join(PROFILE_DIR, profile_id))
+    prune_profiles()
+    
+    # Sampled requests may come from anyone; only admins learn about stored profiles
+    if is_admin_request():
+        response.headers['X-Profile-Id'] = profile_id
+    return response
+
+def prune_profiles():
+    """Delete the oldest stored profiles beyond PROFILE_MAX_FILES."""
+    # File names start with a timestamp, so they sort oldest first
+    profiles = sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith('.prof'))
+    for name in profiles[:max(len(profiles) - PROFILE_MAX_FILES, 0)]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, name))
+        except OSError:
+            # Already removed by a concurrent request
+            pass
+
+@app.teardown_request
+def stop_profiler(exc):
+    """Make sure a profiler is never left running if the request failed."""
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+
 @app.route('/')
 def index():
     """Serve the main dashboard page."""
@@ -13,21 +130,42 @@ def index():
 
 @app.route('/api/projects', methods=['GET'])
 def api_get_projects():
-    """Get all projects, optionally filtered by search query."""
+    """Get all projects, optionally filtered by search query, status and created/updated date ranges."""
     search_query = request.args.get('search', '').strip()
-    
-    if search_query:
-        projects = search_projects(search_query)
-    else:
-        projects = get_all_projects()
-    
-    # Filter by status if provided
     status_filter = request.args.get('status', '').strip()
-    if status_filter:
-        projects = [p for p in projects if p.get('status') == status_filter]
     
+    try:
+        ranges = parse_date_ranges()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    projects = query_projects(search_query, status_filter, ranges)
     return jsonify(projects)
 
+@app.route('/api/projects/activity', methods=['GET'])
+def api_get_activity():
+    """Get project counts per day, week or month of their created or updated date."""
+    field = request.args.get('field', 'updated')
+    bucket = request.args.get('bucket', 'day')
+    
+    if field not in ACTIVITY_FIELDS:
+        return jsonify({'error': f"field must be one of: {', '.join(ACTIVITY_FIELDS)}"}), 400
+    if bucket not in ACTIVITY_BUCKETS:
+        return jsonify({'error': f"bucket must be one of: {', '.join(ACTIVITY_BUCKETS)}"}), 400
+    
+    try:
+        ranges = parse_date_ranges()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    histogram = get_activity_histogram(
+        field, bucket,
+        request.args.get('search', '').strip(),
+        request.args.get('status', '').strip(),
+        ranges
+    )
+    return jsonify(histogram)
+
 @app.route('/api/projects/<int:project_id>', methods=['GET'])
 def api_get_project(project_id):
     """Get a single project by ID."""
@@ -74,6 +212,55 @@ def api_delete_project(project_id):
     
     return jsonify({'message': 'Project deleted successfully'}), 200
 
+@app.route('/api/admin/profiles', methods=['GET'])
+def api_list_profiles():
+    """List stored request profiles, newest first."""
+    if not is_admin_request():
+        return jsonify({'error': 'Admin token required'}), 403
+    
+    if not os.path.isdir(PROFILE_DIR):
+        return jsonify([])
+    
+    profiles = sorted((name for name in os.listdir(PROFILE_DIR) if name.endswith('.prof')), reverse=True)
+    return jsonify(profiles)
+
+@app.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+def api_get_profile(profile_id):
+    """Download a stored profile, or view it as text with ?format=text."""
+    if not is_admin_request():
+        return jsonify({'error': 'Admin token required'}), 403
+    
+    path = os.path.join(PROFILE_DIR, profile_id)
+    if not profile_id.endswith('.prof') or not os.path.isfile(path):
+        return jsonify({'error': 'Profile not found'}), 404
+    
+    if request.args.get('format') == 'text':
+        output = io.StringIO()
+        try:
+            stats = pstats.Stats(path, stream=output)
+        except (EOFError, ValueError, TypeError, OSError):
+            return jsonify({'error': 'Profile is unreadable'}), 400
+        try:
+            stats.sort_stats(request.args.get('sort', 'cumulative'))
+        except KeyError:
+            return jsonify({'error': 'Invalid sort key'}), 400
+        stats.print_stats(50)
+        return output.getvalue(), 200, {'Content-Type': 'text/plain; charset=utf-8'}
+    
+    return send_from_directory(os.path.abspath(PROFILE_DIR), profile_id, as_attachment=True)
+
+@app.route('/api/admin/slow-queries', methods=['GET'])
+def api_get_slow_queries():
+    """Get recent slow-query log entries, optionally only those with full table scans."""
+    if not is_admin_request():
+        return jsonify({'error': 'Admin token required'}), 403
+    
+    entries = get_slow_queries()
+    if request.args.get('full_scans') == '1':
+        entries = [e for e in entries if e['full_scans']]
+    
+    return jsonify(entries)
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
 
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent write throughput with and without write coalescing.
+
+Each mode runs against a fresh database in a temporary directory:
+    direct      - every write commits on its own connection (default journal mode)
+    direct-wal  - as above, with the database in WAL mode
+    coalesced   - writes go through the group-commit writer thread (which uses WAL)
+
+Usage:
+    python benchmark_writes.py [--threads 30] [--writes 3000]
+"""
+
+import os
+import sys
+import time
+import argparse
+import sqlite3
+import tempfile
+import threading
+
+import database
+
+MODES = ('direct', 'direct-wal', 'coalesced')
+
+def run_mode(mode, threads, writes):
+    """Insert `writes` projects from `threads` threads and return (committed writes per second, failed writes)."""
+    per_thread = writes // threads
+    failures = []
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        database.init_db()
+        if mode == 'direct-wal':
+            conn = sqlite3.connect(database.DB_NAME)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.close()
+        
+        database.WRITE_COALESCING = mode == 'coalesced'
+        database._writer = None
+        
+        def work(thread_id):
+            for i in range(per_thread):
+                try:
+                    database._run_write(database._insert_project, {'name': f'bench-{thread_id}-{i}'})
+                except sqlite3.OperationalError:
+                    # e.g. "database is locked" once a writer waits longer than LOCK_TIMEOUT
+                    failures.append(thread_id)
+        
+        workers = [threading.Thread(target=work, args=(t,)) for t in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        
+        if database._writer is not None:
+            database._writer.stop()
+            database._writer = None
+        os.chdir(os.path.dirname(tmp))
+    
+    return (per_thread * threads - len(failures)) / elapsed, len(failures)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark concurrent write throughput.')
+    parser.add_argument('--threads', type=int, default=30, help='Number of writer threads')
+    parser.add_argument('--writes', type=int, default=3000, help='Total number of inserts per mode')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+    
+    # Only lock contention and commits are being measured, not slow queries
+    database.SLOW_QUERY_THRESHOLD_MS = float('inf')
+    
+    baseline = None
+    print(f"{'mode':<12} {'writes/s':>10} {'speedup':>8} {'failed':>7}")
+    for mode in args.modes:
+        rate, failed = run_mode(mode, args.threads, args.writes)
+        baseline = baseline or rate
+        print(f'{mode:<12} {rate:>10.0f} {rate / baseline:>7.1f}x {failed:>7}')
+
+if __name__ == '__main__':
+    sys.exit(main())
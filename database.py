@@ -1,22 +1,349 @@
 import sqlite3
 import os
+import time
+import queue
+import atexit
+import logging
+import threading
+from collections import deque
 from datetime import datetime
 from typing import List, Dict, Optional
 
 DB_NAME = 'projects.db'
 
+# Statements slower than this (in milliseconds) are recorded in the slow-query log
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', '100'))
+SLOW_QUERY_LOG_SIZE = 200
+
+# Seconds a statement waits for a database lock before failing with "database is locked".
+# Lock waits are retried in _retry_locked rather than by SQLite's busy handler, so they can be measured
+LOCK_TIMEOUT = float(os.environ.get('LOCK_TIMEOUT', '5'))
+
+slow_query_logger = logging.getLogger('database.slow_queries')
+_slow_queries = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+
+# When enabled, all mutations go through a single writer thread that commits
+# whatever is queued within WRITE_BATCH_WINDOW_MS (up to WRITE_BATCH_MAX_OPS) in one transaction
+WRITE_COALESCING = os.environ.get('WRITE_COALESCING', '') == '1'
+WRITE_BATCH_WINDOW_MS = float(os.environ.get('WRITE_BATCH_WINDOW_MS', '2'))
+WRITE_BATCH_MAX_OPS = int(os.environ.get('WRITE_BATCH_MAX_OPS', '100'))
+# Longest a caller waits for its queued write to be committed
+WRITE_TIMEOUT = float(os.environ.get('WRITE_TIMEOUT', '30'))
+
+_writer = None
+_writer_lock = threading.Lock()
+
+# Date-range filters on the indexed epoch columns; "after" bounds are inclusive, "before" bounds exclusive
+TIMESTAMP_FILTERS = {
+    'created_after': 'created_ts >= ?',
+    'created_before': 'created_ts < ?',
+    'updated_after': 'updated_ts >= ?',
+    'updated_before': 'updated_ts < ?',
+}
+
+# Activity histogram buckets, as SQLite date expressions over a local-time epoch column
+ACTIVITY_BUCKETS = {
+    'day': "strftime('%Y-%m-%d', {column}, 'unixepoch', 'localtime')",
+    'week': "date({column}, 'unixepoch', 'localtime', 'weekday 0', '-6 days')",
+    'month': "strftime('%Y-%m', {column}, 'unixepoch', 'localtime')",
+}
+ACTIVITY_FIELDS = {
+    'created': 'created_ts',
+    'updated': 'updated_ts',
+}
+
 def get_db_connection():
     """Create and return a database connection."""
-    conn = sqlite3.connect(DB_NAME)
+    # Disable SQLite's busy handler; lock waits are handled by _retry_locked
+    conn = sqlite3.connect(DB_NAME, timeout=0)
     conn.row_factory = sqlite3.Row
     return conn
 
+def _explain(conn, sql: str, params) -> List[str]:
+    """Return the EXPLAIN QUERY PLAN details for a statement."""
+    try:
+        rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()
+    except sqlite3.Error as e:
+        return [f'EXPLAIN failed: {e}']
+    return [row[-1] for row in rows]
+
+def _full_scans(plan: List[str]) -> List[str]:
+    """Return the tables a query plan reads in full rather than seeking with an index.
+    
+    Only SEARCH steps seek; a SCAN visits every row, even "SCAN t USING INDEX i",
+    which just walks the table in index order.
+    """
+    tables = []
+    for detail in plan:
+        words = detail.split()
+        if not words or words[0] != 'SCAN':
+            continue
+        # Older SQLite versions report "SCAN TABLE name", newer ones "SCAN name"
+        if len(words) > 2 and words[1] == 'TABLE':
+            words = words[1:]
+        if len(words) < 2 or detail.startswith(('SCAN CONSTANT ROW', 'SCAN SUBQUERY')) or words[1].startswith('('):
+            continue
+        tables.append(words[1])
+    return tables
+
+def _log_slow_query(conn, sql: str, params, duration_ms: float, lock_wait_ms: float):
+    """Record a slow statement along with its query plan."""
+    plan = _explain(conn, sql, params)
+    entry = {
+        'timestamp': datetime.now().isoformat(),
+        'sql': ' '.join(sql.split()),
+        'params': list(params),
+        'duration_ms': round(duration_ms, 3),
+        'lock_wait_ms': round(lock_wait_ms, 3),
+        'plan': plan,
+        'full_scans': _full_scans(plan),
+    }
+    _slow_queries.append(entry)
+    
+    message = 'Slow query (%.1f ms, %.1f ms lock wait): %s params=%r plan=%s'
+    if entry['full_scans']:
+        message += ' FULL TABLE SCAN on ' + ', '.join(entry['full_scans'])
+    slow_query_logger.warning(message, duration_ms, lock_wait_ms, entry['sql'], entry['params'], ' | '.join(plan))
+
+def _retry_locked(func, *args):
+    """Call func(*args), retrying while another connection holds the database lock.
+    
+    Returns the result and the seconds spent waiting for the lock. Gives up with the
+    original "database is locked" error after LOCK_TIMEOUT seconds.
+    """
+    lock_wait = 0.0
+    attempt = 0
+    
+    while True:
+        start = time.perf_counter()
+        try:
+            return func(*args), lock_wait
+        except sqlite3.OperationalError as e:
+            if 'database is locked' not in str(e) or lock_wait >= LOCK_TIMEOUT:
+                raise
+        time.sleep(min(0.001 * 2 ** attempt, 0.1))
+        attempt += 1
+        lock_wait += time.perf_counter() - start
+
+def _execute(cursor, sql: str, params=()) -> List[sqlite3.Row]:
+    """Execute a statement and fetch its rows, logging it if it exceeds the slow-query threshold.
+    
+    Time spent waiting for another connection's lock is kept out of the measured duration.
+    """
+    start = time.perf_counter()
+    _, lock_wait = _retry_locked(cursor.execute, sql, params)
+    rows = cursor.fetchall()
+    duration_ms = (time.perf_counter() - start - lock_wait) * 1000
+    
+    if duration_ms >= SLOW_QUERY_THRESHOLD_MS:
+        _log_slow_query(cursor.connection, sql, params, duration_ms, lock_wait * 1000)
+    
+    return rows
+
+def get_slow_queries() -> List[Dict]:
+    """Return the most recent slow-query log entries, newest first."""
+    return list(reversed(_slow_queries))
+
+class _WriteOp:
+    """A queued mutation and the slot its outcome is delivered through."""
+    
+    def __init__(self, func, args):
+        self.func = func
+        self.args = args
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+        # 'pending' until the writer starts it, or 'cancelled' if the caller gave up first
+        self.state = 'pending'
+        self.state_lock = threading.Lock()
+    
+    def start(self) -> bool:
+        """Mark the operation as running, unless its caller has already cancelled it."""
+        with self.state_lock:
+            if self.state == 'cancelled':
+                return False
+            self.state = 'running'
+            return True
+    
+    def fail(self, error: Exception):
+        """Fail the operation with its own copy of a batch-level error."""
+        if self.done.is_set():
+            return
+        if self.error is None:
+            # Each caller re-raises its error, so a shared exception object would get its traceback mixed up
+            if isinstance(error, sqlite3.Error):
+                self.error = type(error)(str(error))
+            else:
+                self.error = sqlite3.OperationalError(str(error))
+            self.error.__cause__ = error
+        self.done.set()
+    
+    def wait(self, timeout: float):
+        """Block until the operation is committed, then return its result or raise its error.
+        
+        If the writer has not started the operation within `timeout` seconds it is
+        cancelled and never applied. Once started, the real outcome is awaited.
+        """
+        if not self.done.wait(timeout):
+            with self.state_lock:
+                if self.state == 'pending':
+                    self.state = 'cancelled'
+                    raise sqlite3.OperationalError(f'Timed out after {timeout:g}s waiting for the database writer')
+            self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+class _GroupCommitWriter:
+    """Single writer thread that commits batches of queued mutations in one transaction."""
+    
+    def __init__(self, window_ms: float, max_ops: int):
+        self.window = window_ms / 1000
+        self.max_ops = max_ops
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self.thread.start()
+    
+    def is_alive(self) -> bool:
+        return self.thread.is_alive()
+    
+    def submit(self, func, *args):
+        """Queue a mutation and wait until it has been committed."""
+        op = _WriteOp(func, args)
+        self.queue.put(op)
+        return op.wait(WRITE_TIMEOUT)
+    
+    def stop(self):
+        """Commit any queued operations and stop the writer thread."""
+        self.queue.put(None)
+        self.thread.join()
+    
+    def _collect(self, first: _WriteOp):
+        """Gather operations queued within the batch window, returning the batch and a stop flag."""
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        
+        while len(batch) < self.max_ops:
+            remaining = deadline - time.monotonic()
+            try:
+                op = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if op is None:
+                return batch, True
+            batch.append(op)
+        
+        return batch, False
+    
+    def _connect(self):
+        """Open the writer connection, managing transactions explicitly so a batch shares one commit."""
+        conn = get_db_connection()
+        try:
+            conn.isolation_level = None
+            # WAL lets readers proceed while a batch is being written
+            _retry_locked(conn.execute, 'PRAGMA journal_mode=WAL')
+        except Exception:
+            conn.close()
+            raise
+        return conn
+    
+    def _commit_batch(self, conn, batch: List[_WriteOp]):
+        """Run a batch in one transaction, isolating each operation in its own savepoint."""
+        cursor = conn.cursor()
+        _retry_locked(cursor.execute, 'BEGIN IMMEDIATE')
+        try:
+            for op in batch:
+                if not op.start():
+                    # The caller timed out and was told the write failed
+                    continue
+                cursor.execute('SAVEPOINT write_op')
+                try:
+                    op.result = op.func(cursor, *op.args)
+                except Exception as e:
+                    # Only this operation fails; the rest of the batch still commits
+                    op.error = e
+                    cursor.execute('ROLLBACK TO write_op')
+                cursor.execute('RELEASE write_op')
+            _retry_locked(cursor.execute, 'COMMIT')
+        except Exception:
+            if conn.in_transaction:
+                cursor.execute('ROLLBACK')
+            raise
+    
+    def _run(self):
+        conn = None
+        batch = []
+        try:
+            while True:
+                op = self.queue.get()
+                if op is None:
+                    break
+                batch, stopping = self._collect(op)
+                try:
+                    if conn is None:
+                        conn = self._connect()
+                    self._commit_batch(conn, batch)
+                except Exception as e:
+                    for batch_op in batch:
+                        batch_op.fail(e)
+                    # Start the next batch from a fresh connection in case this one is unusable
+                    if conn is not None:
+                        conn.close()
+                        conn = None
+                else:
+                    for batch_op in batch:
+                        batch_op.done.set()
+                if stopping:
+                    break
+        except BaseException as e:
+            # The thread is exiting unexpectedly; don't leave any caller waiting
+            for batch_op in batch:
+                batch_op.fail(e)
+            self._fail_pending(e)
+            raise
+        finally:
+            if conn is not None:
+                conn.close()
+    
+    def _fail_pending(self, error: BaseException):
+        """Fail every operation still waiting in the queue."""
+        while True:
+            try:
+                op = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            if op is not None:
+                op.fail(error)
+
+def _get_writer() -> _GroupCommitWriter:
+    """Return the shared writer thread, starting (or restarting) it if it is not running."""
+    global _writer
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = _GroupCommitWriter(WRITE_BATCH_WINDOW_MS, WRITE_BATCH_MAX_OPS)
+            atexit.register(_writer.stop)
+        return _writer
+
+def _run_write(func, *args):
+    """Run a mutation func(cursor, *args) and commit it, via the writer thread if coalescing is enabled."""
+    if WRITE_COALESCING:
+        return _get_writer().submit(func, *args)
+    
+    conn = get_db_connection()
+    try:
+        result = func(conn.cursor(), *args)
+        _retry_locked(conn.commit)
+    finally:
+        conn.close()
+    
+    return result
+
 def init_db():
     """Initialize the database and create the projects table if it doesn't exist."""
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    cursor.execute('''
+    _execute(cursor, '''
         CREATE TABLE IF NOT EXISTS projects (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT NOT NULL,
@@ -26,121 +353,183 @@ def init_db():
             updated_date TEXT NOT NULL,
             map_link TEXT,
             resources_link TEXT,
-            proposal_briefing_link TEXT
+            proposal_briefing_link TEXT,
+            created_ts INTEGER,
+            updated_ts INTEGER
         )
     ''')
     
-    conn.commit()
+    # Add epoch timestamp columns to databases created before they existed
+    columns = {row['name'] for row in _execute(cursor, 'PRAGMA table_info(projects)')}
+    for column in ('created_ts', 'updated_ts'):
+        if column not in columns:
+            _execute(cursor, f'ALTER TABLE projects ADD COLUMN {column} INTEGER')
+    
+    # Backfill from the ISO date strings, which are stored in local time
+    _execute(cursor, '''
+        UPDATE projects
+        SET created_ts = CAST(strftime('%s', created_date, 'utc') AS INTEGER)
+        WHERE created_ts IS NULL
+    ''')
+    _execute(cursor, '''
+        UPDATE projects
+        SET updated_ts = CAST(strftime('%s', updated_date, 'utc') AS INTEGER)
+        WHERE updated_ts IS NULL
+    ''')
+    
+    _execute(cursor, 'CREATE INDEX IF NOT EXISTS idx_projects_created_ts ON projects (created_ts)')
+    _execute(cursor, 'CREATE INDEX IF NOT EXISTS idx_projects_updated_ts ON projects (updated_ts)')
+    
+    _retry_locked(conn.commit)
     conn.close()
 
 def get_all_projects() -> List[Dict]:
     """Retrieve all projects from the database."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT * FROM projects ORDER BY updated_date DESC')
-    projects = cursor.fetchall()
-    
-    conn.close()
-    
-    return [dict(project) for project in projects]
+    return query_projects()
 
 def get_project(project_id: int) -> Optional[Dict]:
     """Get a single project by ID."""
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    cursor.execute('SELECT * FROM projects WHERE id = ?', (project_id,))
-    project = cursor.fetchone()
+    rows = _execute(cursor, 'SELECT * FROM projects WHERE id = ?', (project_id,))
+    project = rows[0] if rows else None
     
     conn.close()
     
     return dict(project) if project else None
 
-def create_project(data: Dict) -> Dict:
-    """Create a new project in the database."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    now = datetime.now().isoformat()
+def _insert_project(cursor, data: Dict) -> int:
+    """Insert a project row and return its ID."""
+    now = datetime.now()
     
-    cursor.execute('''
+    _execute(cursor, '''
         INSERT INTO projects (name, description, status, created_date, updated_date, 
-                             map_link, resources_link, proposal_briefing_link)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                             map_link, resources_link, proposal_briefing_link,
+                             created_ts, updated_ts)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     ''', (
         data.get('name', ''),
         data.get('description', ''),
         data.get('status', 'Active'),
-        now,
-        now,
+        now.isoformat(),
+        now.isoformat(),
         data.get('map_link', ''),
         data.get('resources_link', ''),
-        data.get('proposal_briefing_link', '')
+        data.get('proposal_briefing_link', ''),
+        int(now.timestamp()),
+        int(now.timestamp())
     ))
     
-    project_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    return cursor.lastrowid
+
+def create_project(data: Dict) -> Dict:
+    """Create a new project in the database."""
+    project_id = _run_write(_insert_project, data)
     
     return get_project(project_id)
 
-def update_project(project_id: int, data: Dict) -> Optional[Dict]:
-    """Update an existing project."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    now = datetime.now().isoformat()
+def _update_project_row(cursor, project_id: int, data: Dict):
+    """Update a project row in place."""
+    now = datetime.now()
     
-    cursor.execute('''
+    _execute(cursor, '''
         UPDATE projects 
-        SET name = ?, description = ?, status = ?, updated_date = ?,
+        SET name = ?, description = ?, status = ?, updated_date = ?, updated_ts = ?,
             map_link = ?, resources_link = ?, proposal_briefing_link = ?
         WHERE id = ?
     ''', (
         data.get('name', ''),
         data.get('description', ''),
         data.get('status', 'Active'),
-        now,
+        now.isoformat(),
+        int(now.timestamp()),
         data.get('map_link', ''),
         data.get('resources_link', ''),
         data.get('proposal_briefing_link', ''),
         project_id
     ))
-    
-    conn.commit()
-    conn.close()
+
+def update_project(project_id: int, data: Dict) -> Optional[Dict]:
+    """Update an existing project."""
+    _run_write(_update_project_row, project_id, data)
     
     return get_project(project_id)
 
+def _delete_project_row(cursor, project_id: int) -> bool:
+    """Delete a project row, returning whether it existed."""
+    _execute(cursor, 'DELETE FROM projects WHERE id = ?', (project_id,))
+    return cursor.rowcount > 0
+
 def delete_project(project_id: int) -> bool:
     """Delete a project from the database."""
+    return _run_write(_delete_project_row, project_id)
+
+def search_projects(query: str) -> List[Dict]:
+    """Search projects by name or description."""
+    return query_projects(search=query)
+
+def _project_filters(search: str = '', status: str = '', ranges: Optional[Dict[str, int]] = None):
+    """Build a WHERE clause and its parameters from the search, status and date-range filters."""
+    clauses = []
+    params = []
+    
+    if search:
+        clauses.append('(name LIKE ? OR description LIKE ?)')
+        params.extend([f'%{search}%', f'%{search}%'])
+    
+    if status:
+        clauses.append('status = ?')
+        params.append(status)
+    
+    for name, value in (ranges or {}).items():
+        clauses.append(TIMESTAMP_FILTERS[name])
+        params.append(value)
+    
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+    return where, params
+
+def query_projects(search: str = '', status: str = '', ranges: Optional[Dict[str, int]] = None) -> List[Dict]:
+    """Retrieve projects matching the search, status and epoch date-range filters."""
+    where, params = _project_filters(search, status, ranges)
+    
+    # With a created_* range, the unary + stops SQLite from scanning the whole
+    # updated_ts index to satisfy ORDER BY instead of seeking the created_ts index
+    order_column = 'updated_ts'
+    if ranges and any(name.startswith('created_') for name in ranges):
+        order_column = '+updated_ts'
+    
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    cursor.execute('DELETE FROM projects WHERE id = ?', (project_id,))
-    deleted = cursor.rowcount > 0
+    # updated_ts only has second precision; updated_date keeps the microsecond order of edits
+    projects = _execute(cursor, f'''
+        SELECT * FROM projects {where}
+        ORDER BY {order_column} DESC, updated_date DESC, id DESC
+    ''', params)
     
-    conn.commit()
     conn.close()
     
-    return deleted
+    return [dict(project) for project in projects]
 
-def search_projects(query: str) -> List[Dict]:
-    """Search projects by name or description."""
+def get_activity_histogram(field: str = 'updated', bucket: str = 'day', search: str = '',
+                           status: str = '', ranges: Optional[Dict[str, int]] = None) -> List[Dict]:
+    """Count projects per time bucket of their created or updated timestamp."""
+    column = ACTIVITY_FIELDS[field]
+    bucket_expr = ACTIVITY_BUCKETS[bucket].format(column=column)
+    where, params = _project_filters(search, status, ranges)
+    
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    search_term = f'%{query}%'
-    cursor.execute('''
-        SELECT * FROM projects 
-        WHERE name LIKE ? OR description LIKE ?
-        ORDER BY updated_date DESC
-    ''', (search_term, search_term))
+    rows = _execute(cursor, f'''
+        SELECT {bucket_expr} AS bucket, COUNT(*) AS count
+        FROM projects
+        {where}
+        GROUP BY bucket
+        ORDER BY bucket
+    ''', params)
     
-    projects = cursor.fetchall()
     conn.close()
     
-    return [dict(project) for project in projects]
-
-
+    return [dict(row) for row in rows]
@@ -0,0 +1,29 @@
+import os
+import sys
+import importlib
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Run the test against a fresh database in a temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(database, 'LOCK_TIMEOUT', 1.0)
+    database._slow_queries.clear()
+    database.init_db()
+    return database
+
+
+@pytest.fixture
+def client(db, tmp_path, monkeypatch):
+    """Flask test client using the temporary database and profile directory."""
+    app_module = importlib.import_module('app')
+    monkeypatch.setattr(app_module, 'PROFILE_DIR', str(tmp_path / 'profiles'))
+    monkeypatch.setattr(app_module, 'ADMIN_TOKEN', 'secret')
+    app_module.app.testing = True
+    return app_module.app.test_client()
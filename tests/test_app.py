@@ -0,0 +1,115 @@
+import os
+from datetime import datetime
+
+
+def test_non_ascii_admin_token_is_rejected(client):
+    response = client.get('/api/projects', headers={'X-Profile': '1', 'X-Admin-Token': 'sécret'})
+    assert response.status_code == 200
+    assert 'X-Profile-Id' not in response.headers
+    
+    response = client.get('/api/admin/slow-queries', headers={'X-Admin-Token': 'sécret'})
+    assert response.status_code == 403
+
+
+def test_profiles_are_pruned_beyond_limit(client, monkeypatch):
+    import app
+    monkeypatch.setattr(app, 'PROFILE_MAX_FILES', 3)
+    
+    ids = []
+    for _ in range(5):
+        response = client.get('/api/projects', headers={'X-Profile': '1', 'X-Admin-Token': 'secret'})
+        ids.append(response.headers['X-Profile-Id'])
+    
+    assert sorted(os.listdir(app.PROFILE_DIR)) == ids[-3:]
+
+
+def test_out_of_range_timestamp_is_rejected(client):
+    for url in ('/api/projects', '/api/projects/activity'):
+        response = client.get(url + '?created_after=99999999999999999999999')
+        assert response.status_code == 400
+
+
+def test_sampled_profiles_are_not_announced_to_anonymous_clients(client, monkeypatch):
+    import app
+    monkeypatch.setattr(app, 'PROFILE_SAMPLE_RATE', 1.0)
+    
+    response = client.get('/api/projects')
+    assert 'X-Profile-Id' not in response.headers
+    assert len(os.listdir(app.PROFILE_DIR)) == 1
+
+
+def test_corrupt_profile_is_rejected(client):
+    import app
+    os.makedirs(app.PROFILE_DIR)
+    with open(os.path.join(app.PROFILE_DIR, 'broken.prof'), 'wb') as f:
+        f.write(b'not a profile')
+    
+    response = client.get('/api/admin/profiles/broken.prof?format=text', headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 400
+
+
+def local_ts(*args):
+    return int(datetime(*args).timestamp())
+
+
+def add_project(db, name, status, created_ts, updated_ts):
+    project = db.create_project({'name': name, 'status': status})
+    conn = db.get_db_connection()
+    conn.execute('UPDATE projects SET created_ts = ?, updated_ts = ? WHERE id = ?',
+                 (created_ts, updated_ts, project['id']))
+    conn.commit()
+    conn.close()
+
+
+def test_project_list_combines_date_ranges_with_filters(client, db):
+    add_project(db, 'alpha week', 'Active', local_ts(2025, 6, 2), local_ts(2025, 6, 3))
+    add_project(db, 'alpha earlier', 'Active', local_ts(2025, 5, 20), local_ts(2025, 6, 4))
+    add_project(db, 'alpha done', 'Completed', local_ts(2025, 6, 3), local_ts(2025, 6, 3))
+    add_project(db, 'beta week', 'Active', local_ts(2025, 6, 4), local_ts(2025, 6, 5))
+    
+    response = client.get('/api/projects?search=alpha&status=Active'
+                          '&created_after=2025-06-02&created_before=2025-06-09')
+    assert [p['name'] for p in response.json] == ['alpha week']
+    
+    response = client.get(f'/api/projects?updated_after={local_ts(2025, 6, 4)}')
+    assert [p['name'] for p in response.json] == ['beta week', 'alpha earlier']
+
+
+def test_ambiguous_eight_digit_timestamp_is_rejected(client):
+    response = client.get('/api/projects?created_after=20250601')
+    assert response.status_code == 400
+
+
+def test_activity_histogram_buckets(client, db):
+    # 2025-06-02 is a Monday and 2025-06-08 the following Sunday
+    for day in (2, 4, 8, 9):
+        add_project(db, f'june {day}', 'Active', local_ts(2025, 6, day, 12), local_ts(2025, 6, day, 12))
+    add_project(db, 'july', 'On Hold', local_ts(2025, 7, 1, 12), local_ts(2025, 7, 1, 12))
+    
+    response = client.get('/api/projects/activity?bucket=day&field=created')
+    assert response.json == [
+        {'bucket': '2025-06-02', 'count': 1},
+        {'bucket': '2025-06-04', 'count': 1},
+        {'bucket': '2025-06-08', 'count': 1},
+        {'bucket': '2025-06-09', 'count': 1},
+        {'bucket': '2025-07-01', 'count': 1},
+    ]
+    
+    response = client.get('/api/projects/activity?bucket=week')
+    assert response.json == [
+        {'bucket': '2025-06-02', 'count': 3},
+        {'bucket': '2025-06-09', 'count': 1},
+        {'bucket': '2025-06-30', 'count': 1},
+    ]
+    
+    response = client.get('/api/projects/activity?bucket=month&status=Active')
+    assert response.json == [{'bucket': '2025-06', 'count': 4}]
+    
+    response = client.get('/api/projects/activity?bucket=month&updated_before=2025-06-09')
+    assert response.json == [{'bucket': '2025-06', 'count': 3}]
+
+
+def test_activity_histogram_rejects_bad_parameters(client):
+    assert client.get('/api/projects/activity?field=deleted').status_code == 400
+    assert client.get('/api/projects/activity?bucket=year').status_code == 400
+    assert client.get('/api/projects/activity?created_after=soon').status_code == 400
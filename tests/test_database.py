@@ -0,0 +1,277 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+import database
+
+
+def test_full_scans_flags_index_order_scans(db):
+    plan = [
+        'SCAN projects USING INDEX idx_projects_updated_ts',
+        'SCAN TABLE legacy',
+        'SEARCH projects USING INDEX idx_projects_created_ts (created_ts>?)',
+        'SCAN CONSTANT ROW',
+        'SCAN (subquery-1)',
+        'USE TEMP B-TREE FOR ORDER BY',
+    ]
+    assert db._full_scans(plan) == ['projects', 'legacy']
+
+
+def test_slow_query_timing_excludes_lock_wait(db, monkeypatch):
+    monkeypatch.setattr(db, 'SLOW_QUERY_THRESHOLD_MS', 100)
+    
+    blocker = sqlite3.connect(db.DB_NAME, check_same_thread=False)
+    blocker.execute('BEGIN EXCLUSIVE')
+    threading.Timer(0.3, blocker.rollback).start()
+    
+    start = time.perf_counter()
+    db.create_project({'name': 'waited'})
+    assert time.perf_counter() - start >= 0.25
+    
+    assert db.get_slow_queries() == []
+    blocker.close()
+
+
+@pytest.fixture
+def coalescing(db, monkeypatch):
+    """Enable write coalescing with a fresh writer thread for the test."""
+    monkeypatch.setattr(db, 'WRITE_COALESCING', True)
+    monkeypatch.setattr(db, '_writer', None)
+    yield db
+    if db._writer is not None:
+        db._writer.stop()
+
+
+def test_failing_op_is_rolled_back_alone(coalescing, monkeypatch):
+    db = coalescing
+    monkeypatch.setattr(db, 'WRITE_BATCH_WINDOW_MS', 300)
+    batch_sizes = []
+    commit_batch = db._GroupCommitWriter._commit_batch
+    
+    def record_batch(self, conn, batch):
+        batch_sizes.append(len(batch))
+        return commit_batch(self, conn, batch)
+    
+    monkeypatch.setattr(db._GroupCommitWriter, '_commit_batch', record_batch)
+    
+    results = {}
+    
+    def create(name):
+        try:
+            results[name] = db.create_project({'name': name})
+        except Exception as e:
+            results[name] = e
+    
+    threads = [threading.Thread(target=create, args=(name,)) for name in ('a', 'b', None, 'c')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert batch_sizes == [4]
+    assert isinstance(results[None], sqlite3.IntegrityError)
+    assert sorted(p['name'] for p in db.get_all_projects()) == ['a', 'b', 'c']
+
+
+def test_writer_survives_failed_batch(coalescing, monkeypatch):
+    db = coalescing
+    monkeypatch.setattr(db, 'LOCK_TIMEOUT', 0.2)
+    
+    blocker = sqlite3.connect(db.DB_NAME)
+    blocker.execute('BEGIN EXCLUSIVE')
+    with pytest.raises(sqlite3.OperationalError, match='locked'):
+        db.create_project({'name': 'blocked'})
+    blocker.rollback()
+    blocker.close()
+    
+    writer = db._writer
+    assert writer.is_alive()
+    assert db.create_project({'name': 'after'})['name'] == 'after'
+    assert db._writer is writer
+    assert [p['name'] for p in db.get_all_projects()] == ['after']
+
+
+def test_batch_errors_are_not_shared(coalescing, monkeypatch):
+    db = coalescing
+    error = sqlite3.OperationalError('disk I/O error')
+    ops = [db._WriteOp(None, ()) for _ in range(2)]
+    for op in ops:
+        op.fail(error)
+    
+    errors = [pytest.raises(sqlite3.OperationalError, op.wait, 1).value for op in ops]
+    assert errors[0] is not errors[1]
+    assert errors[0].__cause__ is error
+
+
+@pytest.mark.filterwarnings('ignore::pytest.PytestUnhandledThreadExceptionWarning')
+def test_dead_writer_fails_callers_and_restarts(coalescing, monkeypatch):
+    db = coalescing
+    
+    class WriterCrash(BaseException):
+        pass
+    
+    def crash(self, conn, batch):
+        raise WriterCrash('writer crashed')
+    
+    commit_batch = db._GroupCommitWriter._commit_batch
+    monkeypatch.setattr(db._GroupCommitWriter, '_commit_batch', crash)
+    with pytest.raises(sqlite3.OperationalError, match='writer crashed'):
+        db.create_project({'name': 'lost'})
+    
+    db._writer.thread.join(1)
+    assert not db._writer.is_alive()
+    
+    monkeypatch.setattr(db._GroupCommitWriter, '_commit_batch', commit_batch)
+    assert db.create_project({'name': 'restarted'})['name'] == 'restarted'
+    assert db._writer.is_alive()
+
+
+def test_projects_updated_in_same_second_are_newest_first(db):
+    ids = [db.create_project({'name': f'p{i}'})['id'] for i in range(5)]
+    
+    conn = db.get_db_connection()
+    conn.execute('UPDATE projects SET updated_ts = 1000')
+    conn.commit()
+    conn.close()
+    
+    assert [p['id'] for p in db.get_all_projects()] == ids[::-1]
+
+
+def test_project_edited_in_same_second_moves_to_top(db):
+    a = db.create_project({'name': 'a'})
+    db.create_project({'name': 'b'})
+    db.update_project(a['id'], {'name': 'a-edited'})
+    
+    conn = db.get_db_connection()
+    conn.execute('UPDATE projects SET updated_ts = 1000')
+    conn.commit()
+    conn.close()
+    
+    assert [p['name'] for p in db.get_all_projects()] == ['a-edited', 'b']
+
+
+def test_created_range_uses_created_index(db, monkeypatch):
+    monkeypatch.setattr(db, 'SLOW_QUERY_THRESHOLD_MS', 0)
+    
+    db.query_projects(ranges={'created_after': 0})
+    
+    plan = db.get_slow_queries()[0]['plan']
+    assert any('idx_projects_created_ts' in detail for detail in plan)
+
+
+def test_connections_leave_lock_waits_to_retry_loop(db):
+    conn = db.get_db_connection()
+    assert conn.execute('PRAGMA busy_timeout').fetchone()[0] == 0
+    conn.close()
+
+
+def test_timed_out_write_is_never_applied(coalescing, monkeypatch):
+    db = coalescing
+    monkeypatch.setattr(db, 'WRITE_TIMEOUT', 0.3)
+    monkeypatch.setattr(db, 'LOCK_TIMEOUT', 2)
+    
+    blocker = sqlite3.connect(db.DB_NAME, check_same_thread=False)
+    blocker.execute('BEGIN EXCLUSIVE')
+    threading.Timer(0.6, blocker.rollback).start()
+    
+    with pytest.raises(sqlite3.OperationalError, match='Timed out'):
+        db.create_project({'name': 'x'})
+    
+    # Queued behind the cancelled op, so it commits only after the writer has skipped it
+    monkeypatch.setattr(db, 'WRITE_TIMEOUT', 5)
+    assert db.create_project({'name': 'y'})['name'] == 'y'
+    assert [p['name'] for p in db.get_all_projects()] == ['y']
+    blocker.close()
+
+
+def test_started_write_reports_real_outcome_after_timeout(coalescing, monkeypatch):
+    db = coalescing
+    monkeypatch.setattr(db, 'WRITE_TIMEOUT', 0.1)
+    
+    def slow_insert(cursor, data):
+        time.sleep(0.3)
+        return db._insert_project(cursor, data)
+    
+    project_id = db._run_write(slow_insert, {'name': 'slow'})
+    assert db.get_project(project_id)['name'] == 'slow'
+
+
+def set_times(db, project_id, created_ts, updated_ts):
+    conn = db.get_db_connection()
+    conn.execute('UPDATE projects SET created_ts = ?, updated_ts = ? WHERE id = ?',
+                 (created_ts, updated_ts, project_id))
+    conn.commit()
+    conn.close()
+
+
+def test_date_ranges_are_inclusive_after_and_exclusive_before(db):
+    for ts in (100, 200, 300):
+        project = db.create_project({'name': str(ts)})
+        set_times(db, project['id'], ts, ts + 1000)
+    
+    def names(**ranges):
+        return sorted(p['name'] for p in db.query_projects(ranges=ranges))
+    
+    assert names(created_after=200) == ['200', '300']
+    assert names(created_before=300) == ['100', '200']
+    assert names(created_after=200, created_before=300) == ['200']
+    assert names(updated_after=1200) == ['200', '300']
+    assert names(updated_before=1300) == ['100', '200']
+    assert names(created_after=100, updated_before=1200) == ['100']
+
+
+def test_date_ranges_combine_with_status_and_search(db):
+    rows = [
+        ('alpha report', 'Active', 100),
+        ('alpha plan', 'Completed', 100),
+        ('beta report', 'Active', 100),
+        ('alpha old', 'Active', 10),
+    ]
+    for name, status, ts in rows:
+        project = db.create_project({'name': name, 'status': status})
+        set_times(db, project['id'], ts, ts)
+    
+    projects = db.query_projects(search='alpha', status='Active', ranges={'created_after': 50})
+    assert [p['name'] for p in projects] == ['alpha report']
+
+
+def test_init_db_migrates_baseline_schema(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    conn = sqlite3.connect(database.DB_NAME)
+    conn.execute('''
+        CREATE TABLE projects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            description TEXT,
+            status TEXT,
+            created_date TEXT NOT NULL,
+            updated_date TEXT NOT NULL,
+            map_link TEXT,
+            resources_link TEXT,
+            proposal_briefing_link TEXT
+        )
+    ''')
+    created = '2025-06-04T09:30:15.123456'
+    updated = '2025-06-10T17:45:00.654321'
+    conn.execute("INSERT INTO projects (name, status, created_date, updated_date) VALUES ('old', 'Active', ?, ?)",
+                 (created, updated))
+    conn.commit()
+    conn.close()
+    
+    database.init_db()
+    
+    project = database.get_all_projects()[0]
+    assert project['created_ts'] == int(datetime.fromisoformat(created).timestamp())
+    assert project['updated_ts'] == int(datetime.fromisoformat(updated).timestamp())
+    
+    conn = database.get_db_connection()
+    indexes = {row['name'] for row in conn.execute('PRAGMA index_list(projects)')}
+    conn.close()
+    assert {'idx_projects_created_ts', 'idx_projects_updated_ts'} <= indexes
+    
+    # Running it again leaves the migrated database as it is
+    database.init_db()
+    assert database.get_all_projects() == [project]